@@ -1,32 +1,55 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 import streamlit as st
-from langchain_community.chat_models import ChatOllama
-from langchain.agents import initialize_agent, AgentType
-from langchain.tools import Tool
-from langchain.memory import ConversationBufferMemory
+from pydantic import BaseModel, Field
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from langchain_community.callbacks import StreamlitCallbackHandler
+from langchain_ollama import ChatOllama
+
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain.tools import StructuredTool
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain.schema import HumanMessage, SystemMessage
+
+try:
+    import tiktoken
+except ImportError:  # tokenizer is optional; a character heuristic is used
+    tiktoken = None
+
+# HTTP connection reuse: the langchain-ollama ChatOllama holds persistent
+# httpx clients (one sync, one async) for its lifetime, and get_llm caches
+# the instance, so every invocation on both paths reuses kept-alive
+# connections to localhost:11434 instead of paying per-call socket setup.
+
+# Concurrent tool calls and multiple tabs serialize at the Ollama server
+# unless it allows parallel requests. These defaults only take effect if
+# the server is spawned from this environment (e.g. `ollama serve` from
+# the same shell); an already-running server must be restarted with them,
+# as the README and sidebar note.
+os.environ.setdefault("OLLAMA_NUM_PARALLEL", "4")
+os.environ.setdefault("OLLAMA_MAX_LOADED_MODELS", "1")
 
 # -----------------------------
-# Tool factory functions
+# Tool system prompts
 # -----------------------------
 
-def make_skills_gap_tool(llm):
-    """Tool 1: Skills Gap Analyzer"""
+# The static instruction block of each tool is kept as a module-level
+# constant and sent as a system message, with only the user's input in the
+# human message. That keeps the leading tokens byte-identical across
+# successive calls to the same tool, so Ollama's llama.cpp backend can
+# reuse its KV-cache prefix and skip re-prefilling the instructions.
 
-    def _skills_gap_analyzer(input_text: str) -> str:
-        """
-        Expected input format (free-form is OK, but this works best):
-
-        Target Role: <role title>
-        Location: <city/country> (optional)
-        Years of Experience: <X> (optional)
-        User Skills:
-        - skill 1
-        - skill 2
-        - ...
-        Target Job Description:
-        <paste JD or bullets here>
-        """
-        prompt = f"""
-You are a senior career coach and technical mentor.
+SKILLS_GAP_SYSTEM = """You are a senior career coach and technical mentor.
 
 Task: Compare the user's current skills against the target job and identify:
 1. Strong matches
@@ -37,36 +60,9 @@ Task: Compare the user's current skills against the target job and identify:
 
 Be concrete and structured. Use short sections and bullet points.
 
-User & Job Info:
-{input_text}
-"""
-        resp = llm.invoke(prompt)
-        return resp.content
+The user message contains the user & job info."""
 
-    return Tool(
-        name="skills_gap_analyzer",
-        func=_skills_gap_analyzer,
-        description=(
-            "Analyze the gap between a user's current skills and a target job's requirements "
-            "and generate a structured learning path. Use when user asks about skill gaps, "
-            "learning roadmap, or how to reach a specific role."
-        ),
-    )
-
-
-def make_resume_scorer_tool(llm):
-    """Tool 2: Resume Scorer (0–10)"""
-
-    def _resume_scorer(input_text: str) -> str:
-        """
-        Expected input format:
-
-        Target Role: <role>
-        Resume:
-        <paste resume text or bullet points>
-        """
-        prompt = f"""
-You are an expert resume reviewer for top tech companies.
+RESUME_SCORER_SYSTEM = """You are an expert resume reviewer for top tech companies.
 
 Task:
 1. Score the resume out of 10 for the specified target role.
@@ -79,36 +75,9 @@ Task:
 
 Be concise but specific.
 
-Input:
-{input_text}
-"""
-        resp = llm.invoke(prompt)
-        return resp.content
-
-    return Tool(
-        name="resume_scorer",
-        func=_resume_scorer,
-        description=(
-            "Score a resume out of 10 for a target role and provide detailed, actionable feedback. "
-            "Use when user asks to evaluate, review, or improve a resume or CV."
-        ),
-    )
-
+The user message contains the target role and resume."""
 
-def make_salary_estimator_tool(llm):
-    """Tool 3: Salary Estimator"""
-
-    def _salary_estimator(input_text: str) -> str:
-        """
-        Expected input format:
-
-        Job Title: <title>
-        Location: <city/country>
-        Years of Experience: <X>
-        Notes: <industry / company type / remote etc.> (optional)
-        """
-        prompt = f"""
-You are a career and compensation advisor.
+SALARY_ESTIMATOR_SYSTEM = """You are a career and compensation advisor.
 
 Task:
 1. Estimate a realistic **base salary range** for this profile (low, median, high).
@@ -122,15 +91,412 @@ Task:
 
 Be explicit that this is an approximate estimate, not official or guaranteed.
 
-Profile:
-{input_text}
-"""
-        resp = llm.invoke(prompt)
-        return resp.content
+The user message contains the profile."""
 
-    return Tool(
-        name="salary_estimator",
+INTERVIEW_QUESTIONS_SYSTEM = """You are an expert interviewer.
+
+Task:
+1. Generate interview questions for the given role and level.
+2. Include the requested mix of technical and/or behavioral questions.
+3. Group questions by category (e.g., Technical - Python, Technical - SQL, Behavioral).
+4. For each question, optionally add:
+   - a short hint or what the interviewer is looking for,
+   - difficulty tag (easy/medium/hard).
+
+The user message contains the role, level, focus areas, and question count."""
+
+CAREER_COMBO_SYSTEM = """You are a senior career coach and expert resume reviewer.
+
+Task: In ONE pass, produce BOTH of the following for the given role:
+1. A skills-gap analysis (strong matches, partial matches, clear gaps, and
+   an ordered learning roadmap with resources).
+2. A resume review (score out of 10, explanation, concrete improvements,
+   and one revised sample bullet).
+
+Respond with a single JSON object, no code fences, with exactly two keys:
+  "skills_gap": markdown string with the skills-gap analysis,
+  "resume_review": markdown string with the resume review.
+
+The user message contains the role, skills, resume, and job description."""
+
+AGENT_SYSTEM = """You are a career counseling assistant. Use the provided \
+tools to help with skill gaps, resumes, salary expectations, and interview \
+prep; answer directly when no tool fits."""
+
+# -----------------------------
+# Response cache
+# -----------------------------
+
+# Repeated questions (demos, benchmarking, iterative resume edits) rebuild
+# the exact same prompt, so a small LRU keyed on (model, temperature,
+# prompt hash) skips the Ollama round-trip entirely on hits.
+_RESPONSE_CACHE: OrderedDict = OrderedDict()
+_RESPONSE_CACHE_MAXSIZE = 256
+# Every Streamlit session runs in its own thread and OrderedDict's
+# reordering is not thread-safe, so all cache access goes through a lock.
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+# Digests of the static system prompts, computed once at import so the
+# per-call cache key only has to hash the short dynamic input. Lookup is
+# O(1): the constants are the same interned objects with cached hashes.
+_SYSTEM_DIGEST = {
+    system: hashlib.blake2b(system.encode(), digest_size=16).hexdigest()
+    for system in (
+        SKILLS_GAP_SYSTEM,
+        RESUME_SCORER_SYSTEM,
+        SALARY_ESTIMATOR_SYSTEM,
+        INTERVIEW_QUESTIONS_SYSTEM,
+        CAREER_COMBO_SYSTEM,
+    )
+}
+
+
+def _cache_key(llm, prompt) -> tuple:
+    if (
+        isinstance(prompt, list)
+        and len(prompt) == 2
+        and prompt[0].content in _SYSTEM_DIGEST
+    ):
+        dynamic = hashlib.blake2b(
+            prompt[1].content.encode(), digest_size=16
+        ).hexdigest()
+        digest = _SYSTEM_DIGEST[prompt[0].content] + dynamic
+    else:
+        digest = hashlib.blake2b(str(prompt).encode(), digest_size=16).hexdigest()
+    return (llm.model, llm.temperature, digest)
+
+
+def _cache_get(key):
+    with _RESPONSE_CACHE_LOCK:
+        if key in _RESPONSE_CACHE:
+            _RESPONSE_CACHE.move_to_end(key)
+            return _RESPONSE_CACHE[key]
+    return None
+
+
+def _cache_put(key, value) -> None:
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = value
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAXSIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+
+
+# -----------------------------
+# Streaming helper
+# -----------------------------
+
+def _stream_llm(llm, prompt) -> str:
+    """
+    Stream a completion token-by-token into the active chat area and return
+    the full text once generation finishes.
+
+    The main chat block stores a container in session state; each tool call
+    gets its own placeholder inside it so multi-step agent runs don't
+    overwrite each other's output.
+    """
+    container = st.session_state.get("_stream_container")
+    placeholder = container.empty() if container is not None else st.empty()
+
+    key = _cache_key(llm, prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        placeholder.markdown(cached)
+        return cached
+
+    buf = []
+    for chunk in llm.stream(prompt):
+        buf.append(chunk.content)
+        placeholder.markdown("".join(buf))
+    text = "".join(buf)
+    _cache_put(key, text)
+    return text
+
+
+async def _astream_llm(llm, prompt) -> str:
+    """Async twin of _stream_llm, so agent tool calls can overlap their
+    HTTP round-trips to Ollama instead of serializing."""
+    container = st.session_state.get("_stream_container")
+    placeholder = container.empty() if container is not None else st.empty()
+
+    key = _cache_key(llm, prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        placeholder.markdown(cached)
+        return cached
+
+    buf = []
+    async for chunk in llm.astream(prompt):
+        buf.append(chunk.content)
+        placeholder.markdown("".join(buf))
+    text = "".join(buf)
+    _cache_put(key, text)
+    return text
+
+
+# Users can queue several resumes/roles in one message by separating them
+# with a "----" line; matching tools fan the items out concurrently
+# instead of paying one full round-trip (and HTTP handshake) per item.
+_BATCH_SEPARATOR = "\n----\n"
+
+
+def _split_batch(input_text: str) -> list:
+    parts = [p.strip() for p in input_text.split(_BATCH_SEPARATOR)]
+    return [p for p in parts if p]
+
+
+async def _astream_llm_batch(llm, messages_list) -> str:
+    results = await asyncio.gather(
+        *(_astream_llm(llm, messages) for messages in messages_list)
+    )
+    sections = [
+        f"### Item {i}\n\n{text}" for i, text in enumerate(results, start=1)
+    ]
+    return "\n\n".join(sections)
+
+
+# Pasted JDs and resumes can run to thousands of tokens, and attention
+# prefill cost grows superlinearly with prompt length, so tool inputs are
+# clipped to a budget before reaching the model. This bounds worst-case
+# time-to-first-token regardless of how much the user pastes.
+_INPUT_TOKEN_BUDGET = 1500
+_TRUNCATION_MARKER = "\n...[truncated]..."
+
+_ENCODING = tiktoken.get_encoding("cl100k_base") if tiktoken is not None else None
+
+
+def _truncate_to_budget(text: str, max_tokens: int = _INPUT_TOKEN_BUDGET) -> str:
+    if _ENCODING is not None:
+        ids = _ENCODING.encode(text)
+        if len(ids) <= max_tokens:
+            return text
+        return _ENCODING.decode(ids[:max_tokens]) + _TRUNCATION_MARKER
+    # Without a tokenizer, assume ~4 characters per token of English text.
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + _TRUNCATION_MARKER
+
+
+def _tool_messages(system: str, input_text: str) -> list:
+    return [
+        SystemMessage(content=system),
+        HumanMessage(content=_truncate_to_budget(input_text)),
+    ]
+
+
+# -----------------------------
+# Tool factory functions
+# -----------------------------
+
+# Structured argument schemas let the model emit tool calls as JSON
+# instead of free-text "Action: ..." lines that the ReAct parser had to
+# regex back out (and retry with another full LLM call when malformed).
+
+class SkillsGapInput(BaseModel):
+    target_role: str = Field(description="Role the user wants to reach")
+    user_skills: list = Field(description="The user's current skills")
+    job_description: str = Field(
+        default="",
+        description="Target job description or requirement bullets",
+    )
+
+
+class ResumeScorerInput(BaseModel):
+    target_role: str = Field(description="Role the resume targets")
+    resume: str = Field(description="Resume text or bullet points")
+
+
+class SalaryEstimatorInput(BaseModel):
+    job_title: str = Field(description="Job title")
+    location: str = Field(default="", description="City or country")
+    years_of_experience: str = Field(default="", description="Years of experience")
+    notes: str = Field(
+        default="", description="Industry, company type, remote, etc."
+    )
+
+
+class InterviewQuestionsInput(BaseModel):
+    role: str = Field(description="Role to interview for")
+    level: str = Field(default="mid", description="junior / mid / senior / intern")
+    focus_areas: str = Field(default="", description="Topics to focus on")
+    question_types: str = Field(
+        default="both", description="technical / behavioral / both"
+    )
+    num_questions: int = Field(default=10, description="How many questions")
+
+
+class CareerComboInput(BaseModel):
+    target_role: str = Field(description="Role the user wants to reach")
+    user_skills: list = Field(description="The user's current skills")
+    resume: str = Field(description="Resume text or bullet points")
+    job_description: str = Field(
+        default="",
+        description="Target job description or requirement bullets",
+    )
+
+
+def make_skills_gap_tool(llm):
+    """Tool 1: Skills Gap Analyzer"""
+
+    def _format(target_role, user_skills, job_description):
+        skills = "\n".join(f"- {skill}" for skill in user_skills)
+        return (
+            f"Target Role: {target_role}\n"
+            f"User Skills:\n{skills}\n"
+            f"Target Job Description:\n{job_description}"
+        )
+
+    def _skills_gap_analyzer(
+        target_role: str, user_skills: list, job_description: str = ""
+    ) -> str:
+        jds = _split_batch(job_description)
+        if len(jds) > 1:
+            return asyncio.run(
+                _astream_llm_batch(
+                    llm,
+                    [
+                        _tool_messages(
+                            SKILLS_GAP_SYSTEM, _format(target_role, user_skills, jd)
+                        )
+                        for jd in jds
+                    ],
+                )
+            )
+        return _stream_llm(
+            llm,
+            _tool_messages(
+                SKILLS_GAP_SYSTEM, _format(target_role, user_skills, job_description)
+            ),
+        )
+
+    async def _skills_gap_analyzer_async(
+        target_role: str, user_skills: list, job_description: str = ""
+    ) -> str:
+        jds = _split_batch(job_description)
+        if len(jds) > 1:
+            return await _astream_llm_batch(
+                llm,
+                [
+                    _tool_messages(
+                        SKILLS_GAP_SYSTEM, _format(target_role, user_skills, jd)
+                    )
+                    for jd in jds
+                ],
+            )
+        return await _astream_llm(
+            llm,
+            _tool_messages(
+                SKILLS_GAP_SYSTEM, _format(target_role, user_skills, job_description)
+            ),
+        )
+
+    return StructuredTool.from_function(
+        func=_skills_gap_analyzer,
+        coroutine=_skills_gap_analyzer_async,
+        name="skills_gap_analyzer",
+        args_schema=SkillsGapInput,
+        description=(
+            "Analyze the gap between a user's current skills and a target job's requirements "
+            "and generate a structured learning path. Use when user asks about skill gaps, "
+            "learning roadmap, or how to reach a specific role."
+        ),
+    )
+
+
+def make_resume_scorer_tool(llm):
+    """Tool 2: Resume Scorer (0–10)"""
+
+    def _format(target_role, resume):
+        return f"Target Role: {target_role}\nResume:\n{resume}"
+
+    def _resume_scorer(target_role: str, resume: str) -> str:
+        resumes = _split_batch(resume)
+        if len(resumes) > 1:
+            return asyncio.run(
+                _astream_llm_batch(
+                    llm,
+                    [
+                        _tool_messages(RESUME_SCORER_SYSTEM, _format(target_role, r))
+                        for r in resumes
+                    ],
+                )
+            )
+        return _stream_llm(
+            llm, _tool_messages(RESUME_SCORER_SYSTEM, _format(target_role, resume))
+        )
+
+    async def _resume_scorer_async(target_role: str, resume: str) -> str:
+        resumes = _split_batch(resume)
+        if len(resumes) > 1:
+            return await _astream_llm_batch(
+                llm,
+                [
+                    _tool_messages(RESUME_SCORER_SYSTEM, _format(target_role, r))
+                    for r in resumes
+                ],
+            )
+        return await _astream_llm(
+            llm, _tool_messages(RESUME_SCORER_SYSTEM, _format(target_role, resume))
+        )
+
+    return StructuredTool.from_function(
+        func=_resume_scorer,
+        coroutine=_resume_scorer_async,
+        name="resume_scorer",
+        args_schema=ResumeScorerInput,
+        description=(
+            "Score a resume out of 10 for a target role and provide detailed, actionable feedback. "
+            "Use when user asks to evaluate, review, or improve a resume or CV."
+        ),
+    )
+
+
+def make_salary_estimator_tool(llm):
+    """Tool 3: Salary Estimator"""
+
+    def _format(job_title, location, years_of_experience, notes):
+        return (
+            f"Job Title: {job_title}\n"
+            f"Location: {location}\n"
+            f"Years of Experience: {years_of_experience}\n"
+            f"Notes: {notes}"
+        )
+
+    def _salary_estimator(
+        job_title: str,
+        location: str = "",
+        years_of_experience: str = "",
+        notes: str = "",
+    ) -> str:
+        return _stream_llm(
+            llm,
+            _tool_messages(
+                SALARY_ESTIMATOR_SYSTEM,
+                _format(job_title, location, years_of_experience, notes),
+            ),
+        )
+
+    async def _salary_estimator_async(
+        job_title: str,
+        location: str = "",
+        years_of_experience: str = "",
+        notes: str = "",
+    ) -> str:
+        return await _astream_llm(
+            llm,
+            _tool_messages(
+                SALARY_ESTIMATOR_SYSTEM,
+                _format(job_title, location, years_of_experience, notes),
+            ),
+        )
+
+    return StructuredTool.from_function(
         func=_salary_estimator,
+        coroutine=_salary_estimator_async,
+        name="salary_estimator",
+        args_schema=SalaryEstimatorInput,
         description=(
             "Estimate a realistic salary range based on job title, location, and years of experience. "
             "Use when user asks about expected salary, salary range, or compensation."
@@ -141,36 +507,50 @@ Profile:
 def make_interview_question_tool(llm):
     """Tool 4: Interview Question Generator"""
 
-    def _interview_question_generator(input_text: str) -> str:
-        """
-        Expected input format:
-
-        Role: <e.g., Data Scientist, Backend Engineer>
-        Level: <e.g., junior / mid / senior / intern>
-        Focus Areas (optional): <e.g., SQL, Python, system design, ML basics>
-        Question Types: <technical / behavioral / both>
-        Number of Questions: <e.g., 10>
-        """
-        prompt = f"""
-You are an expert interviewer.
-
-Task:
-1. Generate interview questions for the given role and level.
-2. Include the requested mix of technical and/or behavioral questions.
-3. Group questions by category (e.g., Technical - Python, Technical - SQL, Behavioral).
-4. For each question, optionally add:
-   - a short hint or what the interviewer is looking for,
-   - difficulty tag (easy/medium/hard).
-
-Input:
-{input_text}
-"""
-        resp = llm.invoke(prompt)
-        return resp.content
-
-    return Tool(
-        name="interview_question_generator",
+    def _format(role, level, focus_areas, question_types, num_questions):
+        return (
+            f"Role: {role}\n"
+            f"Level: {level}\n"
+            f"Focus Areas: {focus_areas}\n"
+            f"Question Types: {question_types}\n"
+            f"Number of Questions: {num_questions}"
+        )
+
+    def _interview_question_generator(
+        role: str,
+        level: str = "mid",
+        focus_areas: str = "",
+        question_types: str = "both",
+        num_questions: int = 10,
+    ) -> str:
+        return _stream_llm(
+            llm,
+            _tool_messages(
+                INTERVIEW_QUESTIONS_SYSTEM,
+                _format(role, level, focus_areas, question_types, num_questions),
+            ),
+        )
+
+    async def _interview_question_generator_async(
+        role: str,
+        level: str = "mid",
+        focus_areas: str = "",
+        question_types: str = "both",
+        num_questions: int = 10,
+    ) -> str:
+        return await _astream_llm(
+            llm,
+            _tool_messages(
+                INTERVIEW_QUESTIONS_SYSTEM,
+                _format(role, level, focus_areas, question_types, num_questions),
+            ),
+        )
+
+    return StructuredTool.from_function(
         func=_interview_question_generator,
+        coroutine=_interview_question_generator_async,
+        name="interview_question_generator",
+        args_schema=InterviewQuestionsInput,
         description=(
             "Generate technical and behavioral interview questions for a given role and difficulty. "
             "Use when user wants practice questions or mock interview preparation."
@@ -178,15 +558,249 @@ Input:
     )
 
 
+# -----------------------------
+# Intent fast path
+# -----------------------------
+
+# Each agent planning round is a full prefill+decode cycle, so for
+# clearly single-tool questions a keyword match routes straight to the
+# tool's prompt and skips 1-2 LLM round-trips. Ambiguous input (zero or
+# multiple matches) falls through to the full agent.
+INTENT_PATTERNS = {
+    "skills_gap_analyzer": re.compile(
+        r"\b(skills? gap|learning (path|roadmap)|roadmap)\b", re.I
+    ),
+    "resume_scorer": re.compile(r"\b(resume|cv)\b", re.I),
+    "salary_estimator": re.compile(r"\b(salary|salaries|compensation|pay range)\b", re.I),
+    "interview_question_generator": re.compile(
+        r"\b(interview|mock interview)\b", re.I
+    ),
+}
+
+
+def match_intent(user_text: str, tools):
+    """Return the single enabled tool whose pattern matches, else None."""
+    matched = []
+    for tool in tools:
+        pattern = INTENT_PATTERNS.get(tool.name)
+        if pattern and pattern.search(user_text):
+            matched.append(tool)
+    if len(matched) == 2 and {t.name for t in matched} == {
+        "skills_gap_analyzer",
+        "resume_scorer",
+    }:
+        for tool in tools:
+            if tool.name == "career_combo":
+                return tool
+        return None
+    return matched[0] if len(matched) == 1 else None
+
+
+# System prompt used when the fast path bypasses a tool's structured
+# schema and sends the raw user message directly.
+_SYSTEM_BY_TOOL = {
+    "skills_gap_analyzer": SKILLS_GAP_SYSTEM,
+    "resume_scorer": RESUME_SCORER_SYSTEM,
+    "salary_estimator": SALARY_ESTIMATOR_SYSTEM,
+    "interview_question_generator": INTERVIEW_QUESTIONS_SYSTEM,
+    "career_combo": CAREER_COMBO_SYSTEM,
+}
+
+
+def _render_combo(raw: str) -> str:
+    """Split the combo tool's JSON answer into two markdown sections,
+    falling back to the raw text if the model didn't return valid JSON."""
+    cleaned = raw.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        if cleaned.startswith("json"):
+            cleaned = cleaned[len("json"):]
+    try:
+        data = json.loads(cleaned)
+        return (
+            "## Skills Gap\n\n"
+            + str(data.get("skills_gap", ""))
+            + "\n\n## Resume Review\n\n"
+            + str(data.get("resume_review", ""))
+        )
+    except (json.JSONDecodeError, AttributeError):
+        return raw
+
+
+def make_career_combo_tool(llm):
+    """Tool 5: fused Skills Gap + Resume Review in a single LLM call.
+
+    Asking for both analyses in one prompt halves the Ollama round-trips
+    for the common "score my resume AND what am I missing" flow and lets
+    the model share the pasted context internally instead of re-prefilling
+    it for each tool.
+    """
+
+    def _format(target_role, user_skills, resume, job_description):
+        skills = "\n".join(f"- {skill}" for skill in user_skills)
+        return (
+            f"Target Role: {target_role}\n"
+            f"User Skills:\n{skills}\n"
+            f"Resume:\n{resume}\n"
+            f"Target Job Description:\n{job_description}"
+        )
+
+    def _career_combo(
+        target_role: str, user_skills: list, resume: str, job_description: str = ""
+    ) -> str:
+        raw = _stream_llm(
+            llm,
+            _tool_messages(
+                CAREER_COMBO_SYSTEM,
+                _format(target_role, user_skills, resume, job_description),
+            ),
+        )
+        return _render_combo(raw)
+
+    async def _career_combo_async(
+        target_role: str, user_skills: list, resume: str, job_description: str = ""
+    ) -> str:
+        raw = await _astream_llm(
+            llm,
+            _tool_messages(
+                CAREER_COMBO_SYSTEM,
+                _format(target_role, user_skills, resume, job_description),
+            ),
+        )
+        return _render_combo(raw)
+
+    return StructuredTool.from_function(
+        func=_career_combo,
+        coroutine=_career_combo_async,
+        name="career_combo",
+        args_schema=CareerComboInput,
+        description=(
+            "Produce a skills-gap analysis AND a resume review in one shot. "
+            "Use when user asks about BOTH their resume and their skill gap "
+            "for the same role, instead of calling the two tools separately."
+        ),
+    )
+
+
+# Factory table built once at import; build_tools previously rebuilt this
+# dict (constructing all four Tool instances) on every call.
+_FACTORIES = {
+    "Skills Gap Analyzer": make_skills_gap_tool,
+    "Resume Scorer": make_resume_scorer_tool,
+    "Salary Estimator": make_salary_estimator_tool,
+    "Interview Question Generator": make_interview_question_tool,
+    "Career Combo (Resume + Skills Gap)": make_career_combo_tool,
+}
+
+# Tool instances memoized per (display name, llm identity) so repeated
+# build_tools calls skip re-running Pydantic validation on Tool().
+_TOOL_CACHE: dict = {}
+
+
 def build_tools(llm, enabled_tool_names):
     """Return tools filtered by user selection in the sidebar."""
-    all_tools = {
-        "Skills Gap Analyzer": make_skills_gap_tool(llm),
-        "Resume Scorer": make_resume_scorer_tool(llm),
-        "Salary Estimator": make_salary_estimator_tool(llm),
-        "Interview Question Generator": make_interview_question_tool(llm),
-    }
-    return [all_tools[name] for name in enabled_tool_names]
+    tools = []
+    for name in enabled_tool_names:
+        key = (name, id(llm))
+        if key not in _TOOL_CACHE:
+            _TOOL_CACHE[key] = _FACTORIES[name](llm)
+        tools.append(_TOOL_CACHE[key])
+    return tools
+
+
+# -----------------------------
+# Cached LLM / agent construction
+# -----------------------------
+
+@st.cache_resource
+def get_llm(model: str, temp: float, num_ctx: int = 4096):
+    """Build the ChatOllama client once per configuration."""
+    # Explicit threading improves prefill throughput on CPU over Ollama's
+    # derived default. The count is capped: beyond ~16, llama.cpp's
+    # scaling goes negative from contention.
+    n_threads = min(16, os.cpu_count() or 8)
+    return ChatOllama(
+        model=model,
+        temperature=temp,
+        keep_alive="30m",  # keep weights resident between requests
+        num_ctx=num_ctx,
+        num_thread=n_threads,
+    )
+
+
+@st.cache_resource
+def warm_model(model: str) -> None:
+    """
+    Load the model into memory before the first real prompt.
+
+    Ollama defers weight loading until the first generate call, so without
+    this the first user message pays multi-second cold-start on top of
+    generation time. A one-token request with keep_alive makes subsequent
+    requests hit a warm model.
+    """
+    try:
+        requests.post(
+            "http://localhost:11434/api/generate",
+            json={
+                "model": model,
+                "prompt": "",
+                "keep_alive": "30m",
+                "options": {"num_predict": 1},
+            },
+            timeout=120,
+        )
+    except requests.RequestException:
+        # Ollama not up yet; the first real call will load the model.
+        pass
+
+
+@st.cache_resource
+def get_agent_components(model: str, temp: float, num_ctx: int, tool_key: tuple):
+    """
+    Build the agent runnable and tools once per (model, temperature,
+    enabled tools) instead of on every Streamlit rerun; this construction
+    re-parses prompt templates and re-validates Pydantic models, which is
+    a per-rerun hot spot.
+
+    Only the stateless pieces are cached. The AgentExecutor carries the
+    per-session memory, so it is assembled fresh each rerun — sharing one
+    executor across browser sessions would let them overwrite each
+    other's memory mid-run.
+    """
+    llm = get_llm(model, temp, num_ctx)
+    tools = build_tools(llm, list(tool_key))
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", AGENT_SYSTEM),
+            MessagesPlaceholder("chat_history", optional=True),
+            ("human", "{input}"),
+            MessagesPlaceholder("agent_scratchpad"),
+        ]
+    )
+    return create_tool_calling_agent(llm, tools, prompt), tools
+
+
+def _run_async(coro):
+    """
+    Run a coroutine to completion on an event loop whose executor threads
+    carry the Streamlit script-run context.
+
+    LangChain's async callback manager dispatches sync handlers (like
+    StreamlitCallbackHandler) to executor threads via run_in_executor;
+    without the context attached there, their st.* calls render nothing
+    and Streamlit logs a missing-ScriptRunContext warning per step.
+    """
+    ctx = get_script_run_ctx()
+    executor = ThreadPoolExecutor(
+        max_workers=4, initializer=add_script_run_ctx, initargs=(None, ctx)
+    )
+    loop = asyncio.new_event_loop()
+    loop.set_default_executor(executor)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+        executor.shutdown(wait=False)
 
 
 # -----------------------------
@@ -205,8 +819,28 @@ st.write(
 with st.sidebar:
     st.header("⚙️ Configuration")
 
-    model_name = st.text_input("Ollama model name", value="llama3.2")
+    # Q4_K_M halves weight bytes vs Q8_0, and memory bandwidth is the
+    # bottleneck at batch size 1, so the speed preset is the default.
+    quant_preset = st.radio(
+        "Model preset",
+        ["Speed (Q4_K_M)", "Quality (Q8_0)"],
+        help="Quantization trades a little quality for ~2-3x faster generation.",
+    )
+    default_model = (
+        "llama3.2:3b-instruct-q4_K_M"
+        if quant_preset.startswith("Speed")
+        else "llama3.2:3b-instruct-q8_0"
+    )
+    model_name = st.text_input("Ollama model name", value=default_model)
     temperature = st.slider("Temperature", 0.0, 1.5, 0.7, 0.1)
+    num_ctx = st.slider(
+        "Context window (tokens)",
+        2048,
+        16384,
+        4096,
+        1024,
+        help="Raise this if you paste long resumes or job descriptions.",
+    )
 
     st.markdown("**Enabled Tools**")
     default_tools = [
@@ -214,50 +848,93 @@ with st.sidebar:
         "Resume Scorer",
         "Salary Estimator",
         "Interview Question Generator",
+        "Career Combo (Resume + Skills Gap)",
     ]
     enabled_tools = st.multiselect(
         "Select which tools the agent can use:",
         default_tools,
         default=default_tools,
     )
+    st.caption(
+        "Tip: paste several resumes or roles separated by a `----` line and "
+        "the Resume Scorer / Skills Gap Analyzer will process them as one batch."
+    )
+
+    st.caption(
+        "For truly parallel tool calls, run the Ollama server with "
+        "`OLLAMA_NUM_PARALLEL=4` and `OLLAMA_MAX_LOADED_MODELS=1`."
+    )
+
+    debug = st.checkbox(
+        "Debug",
+        value=False,
+        help="Print agent reasoning and tool steps to the terminal.",
+    )
 
     clear_chat = st.button("🧹 Clear Conversation")
 
-# Session state initialization
+if not debug:
+    logging.getLogger("langchain").setLevel(logging.WARNING)
+
+# Fetch cached LLM (built once per configuration, not per rerun)
+llm = get_llm(model_name, temperature, num_ctx)
+warm_model(model_name)
+
+# Session state initialization. A bounded deque keeps per-rerun
+# serialization and GC cost flat on very long chats.
 if "messages" not in st.session_state:
-    st.session_state["messages"] = []
+    st.session_state["messages"] = deque(maxlen=200)
 
 if "memory" not in st.session_state:
-    st.session_state["memory"] = ConversationBufferMemory(
+    # Summarizing memory keeps the on-path prompt roughly constant size:
+    # older turns are folded into a summary off-path instead of being
+    # replayed verbatim, so prefill cost stays flat as the chat grows.
+    st.session_state["memory"] = ConversationSummaryBufferMemory(
+        llm=llm,
+        max_token_limit=800,
         memory_key="chat_history",
         return_messages=True,
     )
+# The summarizer should follow model/temperature changes mid-session.
+st.session_state["memory"].llm = llm
 
+# The button click already triggered this rerun, and state is cleared
+# before the display loop below, so no explicit rerun is needed — the
+# old st.experimental_rerun() here just forced a second, wasted script
+# execution per click.
 if clear_chat:
-    st.session_state["messages"] = []
+    st.session_state["messages"].clear()
     st.session_state["memory"].clear()
-    st.experimental_rerun()
 
-# Display previous chat history
-for msg in st.session_state["messages"]:
+# Display previous chat history. Only the recent window is rendered
+# inline; older turns go behind an expander so long sessions don't
+# re-render hundreds of markdown blocks on every rerun.
+_VISIBLE_MESSAGES = 20
+history = list(st.session_state["messages"])
+older = history[:-_VISIBLE_MESSAGES]
+if older:
+    with st.expander(f"Show older messages ({len(older)})"):
+        for msg in older:
+            with st.chat_message(msg["role"]):
+                st.markdown(msg["content"])
+for msg in history[-_VISIBLE_MESSAGES:]:
     with st.chat_message(msg["role"]):
         st.markdown(msg["content"])
 
-# Create LLM and Agent (per run, reusing memory)
-llm = ChatOllama(
-    model=model_name,
-    temperature=temperature,
+# The expensive runnable/tools are cached per configuration; the cheap
+# executor is built per rerun so each session keeps its own memory.
+agent_runnable, agent_tools = get_agent_components(
+    model_name, temperature, num_ctx, tuple(enabled_tools)
 )
-
-tools = build_tools(llm, enabled_tools)
-
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,  # shows tool reasoning/logs in terminal
+agent = AgentExecutor(
+    agent=agent_runnable,
+    tools=agent_tools,
     memory=st.session_state["memory"],
+    # Verbose printing formats and flushes every step to stdout, which
+    # is measurable on short tool calls and contends with streaming.
+    verbose=debug,
     handle_parsing_errors=True,
+    max_iterations=5,
 )
 
 # Chat input
@@ -269,13 +946,51 @@ if user_input:
     with st.chat_message("user"):
         st.markdown(user_input)
 
-    # Agent response
+    # Agent response. A status widget shows per-step progress (tool
+    # selection, observations) so multi-step runs feel responsive even
+    # between tool hops; tokens still stream below it as they arrive.
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                response = agent.run(user_input)
-            except Exception as e:
-                response = f"Oops, something went wrong: {e}"
-            st.markdown(response)
+        status = st.status("Running tools...", expanded=False)
+        # Tools stream their tokens into this container as they run. It
+        # lives inside an st.empty() slot so the streamed text can be
+        # cleared before the final answer renders below — otherwise the
+        # same text would appear twice.
+        stream_slot = st.empty()
+        st.session_state["_stream_container"] = stream_slot.container()
+        try:
+            fast_tool = match_intent(user_input, agent.tools)
+            if fast_tool is not None:
+                system = _SYSTEM_BY_TOOL[fast_tool.name]
+                items = _split_batch(user_input)
+                if len(items) > 1:
+                    response = asyncio.run(
+                        _astream_llm_batch(
+                            llm,
+                            [_tool_messages(system, item) for item in items],
+                        )
+                    )
+                else:
+                    response = _stream_llm(llm, _tool_messages(system, user_input))
+                if fast_tool.name == "career_combo":
+                    response = _render_combo(response)
+                # The agent didn't run, so record the turn ourselves.
+                st.session_state["memory"].save_context(
+                    {"input": user_input}, {"output": response}
+                )
+            else:
+                result = _run_async(
+                    agent.ainvoke(
+                        {"input": user_input},
+                        {"callbacks": [StreamlitCallbackHandler(status)]},
+                    )
+                )
+                response = result["output"]
+            status.update(label="Done", state="complete")
+        except Exception as e:
+            response = f"Oops, something went wrong: {e}"
+            status.update(label="Something went wrong", state="error")
+        st.session_state["_stream_container"] = None
+        stream_slot.empty()
+        st.markdown(response)
 
     st.session_state["messages"].append({"role": "assistant", "content": response})